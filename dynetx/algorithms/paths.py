@@ -5,6 +5,7 @@ import tqdm
 import random
 import numpy as np
 import copy
+from bisect import bisect_left, bisect_right
 
 __author__ = 'Giulio Rossetti'
 __license__ = "BSD-Clause-2"
@@ -78,8 +79,8 @@ def temporal_dag(G, u, v=None, start=None, end=None):
                          f"{[min(ids), max(ids)]}.")
 
     # adjusting temporal window
-    start = list([i >= start for i in ids]).index(True)
-    end = end if end == ids[-1] else list([i > end for i in ids]).index(True)
+    start = bisect_left(ids, start)
+    end = end if end == ids[-1] else bisect_right(ids, end)
     ids = ids[start:end+1]
 
     # creating empty DAG
@@ -1,6 +1,10 @@
 import networkx as nx
-from collections import defaultdict
-from dynetx.utils import not_implemented
+import numpy as np
+from bisect import bisect_left
+from dynetx.utils import not_implemented, pairwise
+from dynetx.utils.kernels import snapshot_degree
+from dynetx.classes.interaction import InteractionData
+from dynetx.classes.spans import SpanTableMixin
 from copy import deepcopy
 
 __author__ = 'Giulio Rossetti'
@@ -8,7 +12,7 @@ __license__ = "BSD-Clause-2"
 __email__ = "giulio.rossetti@gmail.com"
 
 
-class DynDiGraph(nx.DiGraph):
+class DynDiGraph(SpanTableMixin, nx.DiGraph):
     """
     Base class for directed dynamic graphs.
 
@@ -87,6 +91,8 @@ class DynDiGraph(nx.DiGraph):
     [(3, 2), (1, 3)]
     """
 
+    edge_attr_dict_factory = InteractionData
+
     def __init__(self, data=None, edge_removal=True, **attr):
         """Initialize a directed graph with interaction, name, graph attributes.
 
@@ -112,8 +118,7 @@ class DynDiGraph(nx.DiGraph):
         >>> H = dn.DynDiGraph(edge_removal=True)
         """
         super(self.__class__, self).__init__(data, **attr)
-        self.time_to_edge = defaultdict(int)
-        self.snapshots = {}
+        self._reset_interactions()
         self.edge_removal = edge_removal
         self.directed = True
 
@@ -145,9 +150,9 @@ class DynDiGraph(nx.DiGraph):
         """
         if t is not None:
             if not data:
-                return [n for n, d in self.degree(t=t).items() if d > 0]
+                return self.__active_nodes(t)
             else:
-                return {n: self._node[n] for n, d in self.degree(t=t).items() if d > 0}
+                return {n: self._node[n] for n in self.__active_nodes(t)}
 
         if not data:
             return iter(self._node)
@@ -273,20 +278,34 @@ class DynDiGraph(nx.DiGraph):
         """
         return list(self.interactions_iter(nbunch, t))
 
+    def __active_nodes(self, t):
+        """Yield the nodes having at least an interaction in snapshot t."""
+        if not self.edge_removal:
+            # interactions never vanish: a node is active from its first appearance on
+            if len(self.snapshots) == 0 or t > max(self.snapshots):
+                return
+            for u, succs in self._succ.items():
+                if any(d.t[0][0] <= t for d in succs.values()) or \
+                        any(d.t[0][0] <= t for d in self._pred[u].values()):
+                    yield u
+        else:
+            for u, succs in self._succ.items():
+                if any(self._present(d, t) for d in succs.values()) or \
+                        any(self._present(d, t) for d in self._pred[u].values()):
+                    yield u
+
     def __presence_test(self, u, v, t):
         if v not in self._succ[u]:
             return False
-        spans = self._succ[u][v]['t']
-        if self.edge_removal:
-            if spans[0][0] <= t <= spans[-1][1]:
-                for s in spans:
-                    if t in range(s[0], s[1] + 1):
-                        return True
-        else:
-            if spans[0][0] <= t <= max(self.temporal_snapshots_ids()):
-                return True
+        return self._present(self._succ[u][v], t)
 
-        return False
+    def __snapshot_degree(self, t, succ=True, pred=True):
+        """Yield (node, degree) at time t for all the nodes, counting the requested directions."""
+        nodes, index, src, dst, t_start, t_end = self._snapshot_table()
+        deg = snapshot_degree(src, dst, t_start, t_end, t, len(nodes), out_deg=succ, in_deg=pred)
+        for n in self._succ:
+            i = index.get(n)
+            yield n, 0 if i is None else int(deg[i])
 
     def number_of_nodes(self, t=None):
         """Return the number of nodes in the t snapshot of a dynamic graph.
@@ -317,7 +336,7 @@ class DynDiGraph(nx.DiGraph):
         if t is None:
             return len(self._node)
         else:
-            nds = sum([1 for n in self.degree(t=t).values() if n > 0])
+            nds = sum(1 for _ in self.__active_nodes(t))
             return nds
 
     def avg_number_of_nodes(self):
@@ -377,6 +396,10 @@ class DynDiGraph(nx.DiGraph):
             [(0, 1), (1, 1)]
             """
 
+        if nbunch is None and t is not None:
+            yield from self.__snapshot_degree(t)
+            return
+
         if nbunch is None:
             nodes_nbrs = ((n, succs, self._pred[n]) for n, succs in self._succ.items())
         else:
@@ -388,8 +411,8 @@ class DynDiGraph(nx.DiGraph):
 
         else:
             for n, succ, pred in nodes_nbrs:
-                edges_succ = len([v for v in succ.keys() if self.__presence_test(n, v, t)])
-                edges_pred = len([v for v in pred.keys() if self.__presence_test(v, n, t)])
+                edges_succ = sum(1 for d in succ.values() if self._present(d, t))
+                edges_pred = sum(1 for d in pred.values() if self._present(d, t))
                 yield n, edges_succ + edges_pred
 
     def degree(self, nbunch=None, t=None):
@@ -468,23 +491,29 @@ class DynDiGraph(nx.DiGraph):
         >>> list(G.interactions_iter())
         [(0, 1), (1, 2), (2, 3)]
         """
-        seen = {}  # helper dict to keep track of multiply stored interactions
         if nbunch is None:
             nodes_nbrs_succ = self._succ.items()
         else:
-            nodes_nbrs_succ = [(n, self._succ[n]) for n in self.nbunch_iter(nbunch)]
+            nodes_nbrs_succ = ((n, self._succ[n]) for n in self.nbunch_iter(nbunch))
+        for e in self.__interactions(nodes_nbrs_succ, t):
+            yield e
 
-        for n, nbrs in nodes_nbrs_succ:
-            for nbr in nbrs:
-                if t is not None:
-                    if nbr not in seen and self.__presence_test(n, nbr, t):
-                        yield n, nbr, {"t": [t]}
-                else:
+    def __interactions(self, nodes_nbrs_succ, t):
+        """Yield the interactions stored in nodes_nbrs_succ, filtered by snapshot t if given."""
+        seen = set()  # helper set to keep track of multiply stored interactions
+        if t is None:
+            for n, nbrs in nodes_nbrs_succ:
+                for nbr, data in nbrs.items():
                     if nbr not in seen:
-                        yield nbr, n, self._succ[n][nbr]
-            seen[n] = 1
-
-        del seen
+                        yield nbr, n, data
+                seen.add(n)
+        else:
+            presence = self.__presence_test
+            for n, nbrs in nodes_nbrs_succ:
+                for nbr in nbrs:
+                    if nbr not in seen and presence(n, nbr, t):
+                        yield n, nbr, {"t": [t]}
+                seen.add(n)
 
     def add_interaction(self, u, v, t=None, e=None):
         """Add an interaction between u and v at time t vanishing (optional) at time e.
@@ -527,6 +556,13 @@ class DynDiGraph(nx.DiGraph):
             raise nx.NetworkXError(
                 "The t argument must be specified.")
 
+        self._clear_caches()
+        t = self._interaction_span(t, e)
+        self._insert_interaction(u, v, t, e)
+        self._account_interactions(t, e)
+
+    def _insert_interaction(self, u, v, t, e):
+        """Store the interaction (u, v) on span t: t is stored as is, callers must own it."""
         if u not in self._succ:
             self._succ[u] = self.adjlist_inner_dict_factory()
             self._pred[u] = self.adjlist_inner_dict_factory()
@@ -536,32 +572,26 @@ class DynDiGraph(nx.DiGraph):
             self._pred[v] = self.adjlist_inner_dict_factory()
             self._node[v] = {}
 
-        if type(t) != list:
-            t = [t, t]
-
-        for idt in [t[0]]:
-            if self.has_edge(u, v) and not self.edge_removal:
-                continue
-            else:
-                if idt not in self.time_to_edge:
-                    self.time_to_edge[idt] = {(u, v, "+"): None}
-                else:
-                    if (u, v, "+") not in self.time_to_edge[idt]:
-                        self.time_to_edge[idt][(u, v, "+")] = None
+        datadict = self._succ[u].get(v)
+        idt = t[0]
+        if self.edge_removal or datadict is None:
+            self.time_to_edge[idt][(u, v, "+")] = None
 
         if e is not None and self.edge_removal:
-
-            t[1] = e - 1
-            if e not in self.time_to_edge:
-                self.time_to_edge[e] = {(u, v, "-"): None}
-            else:
-                self.time_to_edge[e][(u, v, "-")] = None
-
-        # add the interaction
-        datadict = self.adj[u].get(v, self.edge_attr_dict_factory())
-
-        if 't' in datadict:
-            app = datadict['t']
+            self.time_to_edge[e][(u, v, "-")] = None
+
+        if datadict is None:
+            # a new pair: both endpoints share its data, later updated in place
+            datadict = self.edge_attr_dict_factory()
+            datadict.t = [t]
+            self._number_of_pairs += 1
+            self._succ[u][v] = datadict
+            self._pred[v][u] = datadict
+            return
+
+        # an existing pair: extend its spans
+        app = datadict.t
+        if app is not None:
             max_end = app[-1][1]
 
             if max_end == app[-1][0] and t[0] == app[-1][0] + 1:
@@ -588,34 +618,18 @@ class DynDiGraph(nx.DiGraph):
                         if self.edge_removal:
                             if max_end + 1 in self.time_to_edge and (u, v, '-') in self.time_to_edge[max_end + 1]:
                                 del self.time_to_edge[max_end + 1][(u, v, '-')]
-                            if t[1] + 1 in self.time_to_edge:
-                                self.time_to_edge[t[1] + 1][(u, v, "-")] = None
-                            else:
-                                self.time_to_edge[t[1] + 1] = {(u, v, "-"): None}
+                            self.time_to_edge[t[1] + 1][(u, v, "-")] = None
 
                     app[-1][1] = t[1]
+                elif t[1] <= max_end:
+                    # the interaction is already covered by the last span
+                    pass
                 else:
                     app.append(t)
         else:
-            datadict['t'] = [t]
-
-        if e is not None:
-            span = range(t[0], t[1] + 1)
-            for idt in span:
-                if idt not in self.snapshots:
-                    self.snapshots[idt] = 1
-                else:
-                    self.snapshots[idt] += 1
-        else:
-            for idt in t:
-                if idt is not None:
-                    if idt not in self.snapshots:
-                        self.snapshots[idt] = 1
-                    else:
-                        self.snapshots[idt] += 1
-
-        self._succ[u][v] = datadict
-        self._pred[v][u] = datadict
+            datadict.t = [t]
+        # the spans may have been updated in place
+        datadict.reset_mask()
 
     def add_interactions_from(self, ebunch, t=None, e=None):
         """Add all the interaction in ebunch at time t.
@@ -640,9 +654,19 @@ class DynDiGraph(nx.DiGraph):
         if t is None:
             raise nx.NetworkXError(
                 "The t argument must be a specified.")
+        self._clear_caches()
+        span = self._interaction_span(t, e)
+
         # process ebunch
-        for ed in ebunch:
-            self.add_interaction(ed[0], ed[1], t, e)
+        count = 0
+        try:
+            for ed in ebunch:
+                self._insert_interaction(ed[0], ed[1], span[:], e)
+                count += 1
+        finally:
+            # the whole batch shares the same span: account for it at once
+            if count > 0:
+                self._account_interactions(span, e, count)
 
     def in_interactions_iter(self, nbunch=None, t=None):
         """Return an iterator over the in interactions present in a given snapshot.
@@ -964,7 +988,9 @@ class DynDiGraph(nx.DiGraph):
             if t is None:
                 return iter(self._succ[n])
             else:
-                return iter([i for i in self._succ[n] if self.__presence_test(n, i, t)])
+                if self._use_csr():
+                    return iter(self._frozen_neighbors(self._succ, 'succ', n, t))
+                return iter([i for i, d in self._succ[n].items() if self._present(d, t)])
         except KeyError:
             raise nx.NetworkXError("The node %s is not in the graph." % (n,))
 
@@ -985,7 +1011,9 @@ class DynDiGraph(nx.DiGraph):
             if t is None:
                 return iter(self._pred[n])
             else:
-                return iter([i for i in self._pred[n] if self.__presence_test(i, n, t)])
+                if self._use_csr():
+                    return iter(self._frozen_neighbors(self._pred, 'pred', n, t))
+                return iter([i for i, d in self._pred[n].items() if self._present(d, t)])
         except KeyError:
             raise nx.NetworkXError("The node %s is not in the graph." % (n,))
 
@@ -1095,6 +1123,10 @@ class DynDiGraph(nx.DiGraph):
         >>> list(G.in_degree_iter([0,1], t=0))
         [(0, 0), (1, 1)]
         """
+        if nbunch is None and t is not None:
+            yield from self.__snapshot_degree(t, succ=False)
+            return
+
         if nbunch is None:
             nodes_nbrs = self._pred.items()
         else:
@@ -1106,11 +1138,7 @@ class DynDiGraph(nx.DiGraph):
                 yield n, deg
         else:
             for n, nbrs in nodes_nbrs:
-                edges_t = len([v for v in nbrs.keys() if self.__presence_test(v, n, t)])
-                if edges_t > 0:
-                    yield n, edges_t
-                else:
-                    yield n, 0
+                yield n, sum(1 for d in nbrs.values() if self._present(d, t))
 
     def out_degree(self, nbunch=None, t=None):
         """Return the out degree of a node or nodes at time t.
@@ -1186,6 +1214,10 @@ class DynDiGraph(nx.DiGraph):
         >>> list(G.out_degree_iter([0,1], t=0))
         [(0, 1)]
         """
+        if nbunch is None and t is not None:
+            yield from self.__snapshot_degree(t, pred=False)
+            return
+
         if nbunch is None:
             nodes_nbrs = self._succ.items()
         else:
@@ -1197,11 +1229,7 @@ class DynDiGraph(nx.DiGraph):
                 yield n, deg
         else:
             for n, nbrs in nodes_nbrs:
-                edges_t = len([v for v in nbrs.keys() if self.__presence_test(n, v, t)])
-                if edges_t > 0:
-                    yield n, edges_t
-                else:
-                    yield n, 0
+                yield n, sum(1 for d in nbrs.values() if self._present(d, t))
 
     def size(self, t=None):
         """Return the number of edges at time t.
@@ -1227,8 +1255,19 @@ class DynDiGraph(nx.DiGraph):
         >>> G.size(t=0)
         3
         """
-        s = sum(self.degree(t=t).values()) / 2
-        return int(s)
+        if t is None:
+            if isinstance(self._succ, dict):
+                return self._number_of_pairs
+            # subgraph views filter the adjacency: the counter does not describe them
+            s = sum(self.degree(t=t).values()) / 2
+            return int(s)
+
+        def count():
+            # spans of the same interaction are disjoint: at most one of them covers t
+            _, _, _, _, t_start, t_end = self._snapshot_table()
+            return int(np.count_nonzero((t_start <= t) & (t <= t_end)))
+
+        return self._cached(('size', t), count)
 
     def stream_interactions(self):
         """Generate a temporal ordered stream of interactions.
@@ -1252,10 +1291,9 @@ class DynDiGraph(nx.DiGraph):
         >>> list(G.stream_interactions())
         [(0, 1, '+', 0), (1, 2, '+', 0), (2, 3, '+', 0), (3, 4, '+', 1), (4, 5, '+', 1), (5, 6, '+', 1)]
         """
-        timestamps = sorted(self.time_to_edge.keys())
-        for t in timestamps:
-            for e in self.time_to_edge[t]:
-                yield e[0], e[1], e[2], t
+        for t in self._stream_ids():
+            for u, v, op in self.time_to_edge[t]:
+                yield u, v, op, t
 
     def time_slice(self, t_from, t_to=None):
         """Return an new graph containing nodes and interactions present in [t_from, t_to].
@@ -1292,36 +1330,13 @@ class DynDiGraph(nx.DiGraph):
             >>> H.interactions()
             [(0, 1), (1, 2), (1, 3), (0, 4), (4, 5), (5, 6)]
         """
-        # create new graph and copy subgraph into it
-        H = self.__class__()
-
         if t_to is not None:
             if t_to < t_from:
                 raise ValueError("Invalid range: t_to must be grater that t_from")
         else:
             t_to = t_from
 
-        for u, v, ts in self.interactions_iter():
-            i_to = t_to
-            f_from = t_from
-
-            for a, b in ts['t']:
-                if i_to < a or f_from > b:
-                    continue
-
-                if f_from >= a and i_to <= b:
-                    H.add_interaction(u, v, f_from, i_to)
-                elif a >= f_from and i_to <= b:
-                    H.add_interaction(u, v, a, i_to)
-                elif f_from >= a and b <= i_to:
-                    H.add_interaction(u, v, f_from, b)
-                elif f_from <= a and b <= i_to:
-                    H.add_interaction(u, v, a, b)
-
-        for n in H.nodes():
-            H._node[n] = self._node[n]
-
-        return H
+        return self._time_slice(t_from, t_to)
 
     def update_node_attr(self, n, **data):
         """Updates the attributes of a specified node.
@@ -1385,7 +1400,7 @@ class DynDiGraph(nx.DiGraph):
             >>> G.temporal_snapshots_ids()
             [0, 1, 2]
         """
-        return sorted(self.snapshots.keys())
+        return list(self._snapshot_ids())
 
     def interactions_per_snapshots(self, t=None):
         """Return the number of interactions within snapshot t.
@@ -1763,21 +1778,25 @@ class DynDiGraph(nx.DiGraph):
         H.add_nodes_from(self)
 
         if reciprocal is True:
-            for u in self._node:
-                for v in self._node:
-                    if u >= v:
+            for u, succs in self._succ.items():
+                preds = self._pred[u]
+                for v in succs:
+                    if u >= v and v in preds:
                         try:
-                            outc = self._succ[u][v]['t']
-                            intc = self._pred[u][v]['t']
+                            outc = succs[v]['t']
+                            intc = preds[v]['t']
                             for o in outc:
-                                r = set(range(o[0], o[1] + 1))
-                                for i in intc:
-                                    r2 = set(range(i[0], i[1] + 1))
-                                    inter = list(r & r2)
-                                    if len(inter) == 1:
-                                        H.add_interaction(u, v, t=inter[0])
-                                    elif len(inter) > 1:
-                                        H.add_interaction(u, v, t=inter[0], e=inter[-1])
+                                # spans are sorted and disjoint: jump to the first one overlapping o
+                                i = bisect_left(intc, [o[0]])
+                                if i > 0 and intc[i - 1][1] >= o[0]:
+                                    i -= 1
+                                while i < len(intc) and intc[i][0] <= o[1]:
+                                    start, end = max(o[0], intc[i][0]), min(o[1], intc[i][1])
+                                    if start == end:
+                                        H.add_interaction(u, v, t=start)
+                                    elif start < end:
+                                        H.add_interaction(u, v, t=start, e=end)
+                                    i += 1
 
                         except Exception:
                             pass
@@ -1810,6 +1829,4 @@ class DynDiGraph(nx.DiGraph):
         >>> G = dn.DynDiGraph()
         >>> G.add_path([0,1,2,3], t=0)
         """
-        nlist = list(nodes)
-        interaction = zip(nlist[:-1], nlist[1:])
-        self.add_interactions_from(interaction, t)
+        self._add_pairs(pairwise(nodes), t)
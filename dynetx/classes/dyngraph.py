@@ -8,17 +8,20 @@ Self-loops are allowed.
 from typing import List, Any
 
 import networkx as nx
-from collections import defaultdict
-from dynetx.utils import not_implemented
+import numpy as np
+from dynetx.utils import not_implemented, pairwise
+from dynetx.utils.kernels import snapshot_degree
+from dynetx.classes.interaction import InteractionData
+from dynetx.classes.spans import SpanTableMixin
 from copy import deepcopy
-from itertools import combinations
+from itertools import chain, combinations
 
 __author__ = 'Giulio Rossetti'
 __license__ = "BSD-Clause-2"
 __email__ = "giulio.rossetti@gmail.com"
 
 
-class DynGraph(nx.Graph):
+class DynGraph(SpanTableMixin, nx.Graph):
     """
     Base class for undirected dynamic graphs.
 
@@ -97,6 +100,8 @@ class DynGraph(nx.Graph):
     [(3, 2), (1, 3)]
     """
 
+    edge_attr_dict_factory = InteractionData
+
     def __init__(self, data=None, edge_removal=True, **attr):
         """Initialize a graph with interaction, name, graph attributes.
 
@@ -120,11 +125,15 @@ class DynGraph(nx.Graph):
         >>> G1 = dn.DynGraph(edge_removal=True)
         """
         super(self.__class__, self).__init__(data, **attr)
-        self.time_to_edge = defaultdict(int)
-        self.snapshots = {}
+        self._reset_interactions()
         self.edge_removal = edge_removal
         self.directed = False
 
+    def _reset_interactions(self):
+        """Forget every interaction, see SpanTableMixin: self loops are counted apart."""
+        super(DynGraph, self)._reset_interactions()
+        self._number_of_loops = 0
+
     def nodes_iter(self, t=None, data=False):
         """Return an iterator over the nodes with respect to a given temporal snapshot.
 
@@ -152,9 +161,9 @@ class DynGraph(nx.Graph):
         """
         if t is not None:
             if not data:
-                return [n for n, d in self.degree(t=t).items() if d > 0]
+                return self.__active_nodes(t)
             else:
-                return {n: self._node[n] for n, d in self.degree(t=t).items() if d > 0}
+                return {n: self._node[n] for n in self.__active_nodes(t)}
 
         if not data:
             return iter(self._node)
@@ -239,18 +248,28 @@ class DynGraph(nx.Graph):
         """
         return list(self.interactions_iter(nbunch, t))
 
-    def __presence_test(self, u, v, t):
-        spans = self._adj[u][v]['t']
-        if self.edge_removal:
-            if spans[0][0] <= t <= spans[-1][1]:
-                for s in spans:
-                    if t in range(s[0], s[1] + 1):
-                        return True
+    def __active_nodes(self, t):
+        """Yield the nodes having at least an interaction in snapshot t."""
+        if not self.edge_removal:
+            # interactions never vanish: a node is active from its first appearance on
+            if len(self.snapshots) == 0 or t > max(self.snapshots):
+                return
+            for u, nbrs in self._adj.items():
+                if any(d.t[0][0] <= t for d in nbrs.values()):
+                    yield u
         else:
-            if spans[0][0] <= t <= max(self.temporal_snapshots_ids()):
-                return True
+            for u, nbrs in self._adj.items():
+                if any(self._present(d, t) for d in nbrs.values()):
+                    yield u
+
+    def __presence_test(self, u, v, t):
+        return self._present(self._adj[u][v], t)
 
-        return False
+    def __snapshot_interactions(self, t):
+        """Return the (u, v) pairs active in snapshot t, masking the snapshot table."""
+        nodes, _, src, dst, t_start, t_end = self._snapshot_table()
+        mask = (t_start <= t) & (t <= t_end)
+        return [(nodes[iu], nodes[iv]) for iu, iv in zip(src[mask].tolist(), dst[mask].tolist())]
 
     def interactions_iter(self, nbunch=None, t=None):
         """Return an iterator over the interaction present in a given snapshot.
@@ -291,22 +310,30 @@ class DynGraph(nx.Graph):
         >>> list(G.interactions_iter())
         [(0, 1), (1, 2), (2, 3)]
         """
-        seen = {}  # helper dict to keep track of multiply stored interactions
+        if nbunch is None and t is not None:
+            for u, v in self.__snapshot_interactions(t):
+                yield u, v, {"t": [t]}
+            return
+
+        seen = set()  # nodes already visited: their interactions have been yielded
         if nbunch is None:
             nodes_nbrs = self._adj.items()
         else:
             nodes_nbrs = ((n, self._adj[n]) for n in self.nbunch_iter(nbunch))
 
-        for n, nbrs in nodes_nbrs:
-            for nbr in nbrs:
-                if t is not None:
-                    if nbr not in seen and self.__presence_test(n, nbr, t):
-                        yield n, nbr, {"t": [t]}
-                else:
+        if t is None:
+            for n, nbrs in nodes_nbrs:
+                for nbr, data in nbrs.items():
                     if nbr not in seen:
-                        yield n, nbr, self._adj[n][nbr]
-            seen[n] = 1
-        del seen
+                        yield n, nbr, data
+                seen.add(n)
+        else:
+            presence = self.__presence_test
+            for n, nbrs in nodes_nbrs:
+                for nbr in nbrs:
+                    if nbr not in seen and presence(n, nbr, t):
+                        yield n, nbr, {"t": [t]}
+                seen.add(n)
 
     def add_interaction(self, u, v, t=None, e=None):
         """Add an interaction between u and v at time t vanishing (optional) at time e.
@@ -348,6 +375,13 @@ class DynGraph(nx.Graph):
             raise nx.NetworkXError(
                 "The t argument must be specified.")
 
+        self._clear_caches()
+        t = self._interaction_span(t, e)
+        self._insert_interaction(u, v, t, e)
+        self._account_interactions(t, e)
+
+    def _insert_interaction(self, u, v, t, e):
+        """Store the interaction (u, v) on span t: t is stored as is, callers must own it."""
         if u not in self._node:
             self._adj[u] = self.adjlist_inner_dict_factory()
             self._node[u] = {}
@@ -355,32 +389,28 @@ class DynGraph(nx.Graph):
             self._adj[v] = self.adjlist_inner_dict_factory()
             self._node[v] = {}
 
-        if not isinstance(t, list):
-            t = [t, t]
-
-        for idt in [t[0]]:
-            if self.has_edge(u, v) and not self.edge_removal:
-                continue
-            else:
-                if idt not in self.time_to_edge:
-                    self.time_to_edge[idt] = {(u, v, "+"): None}
-                else:
-                    if (u, v, "+") not in self.time_to_edge[idt]:
-                        self.time_to_edge[idt][(u, v, "+")] = None
+        datadict = self._adj[u].get(v)
+        idt = t[0]
+        if self.edge_removal or datadict is None:
+            self.time_to_edge[idt][(u, v, "+")] = None
 
         if e is not None and self.edge_removal:
-
-            t[1] = e - 1
-            if e not in self.time_to_edge:
-                self.time_to_edge[e] = {(u, v, "-"): None}
-            else:
-                self.time_to_edge[e][(u, v, "-")] = None
-
-        # add the interaction
-        datadict = self._adj[u].get(v, self.edge_attr_dict_factory())
-
-        if 't' in datadict:
-            app = datadict['t']
+            self.time_to_edge[e][(u, v, "-")] = None
+
+        if datadict is None:
+            # a new pair: both endpoints share its data, later updated in place
+            datadict = self.edge_attr_dict_factory()
+            datadict.t = [t]
+            self._number_of_pairs += 1
+            if u == v:
+                self._number_of_loops += 1
+            self._adj[u][v] = datadict
+            self._adj[v][u] = datadict
+            return
+
+        # an existing pair: extend its spans
+        app = datadict.t
+        if app is not None:
             max_end = app[-1][1]
 
             if max_end == app[-1][0] and t[0] == app[-1][0] + 1:
@@ -407,34 +437,18 @@ class DynGraph(nx.Graph):
                         if self.edge_removal:
                             if max_end + 1 in self.time_to_edge and (u, v, '-') in self.time_to_edge[max_end + 1]:
                                 del self.time_to_edge[max_end + 1][(u, v, '-')]
-                            if t[1] + 1 in self.time_to_edge:
-                                self.time_to_edge[t[1] + 1][(u, v, "-")] = None
-                            else:
-                                self.time_to_edge[t[1] + 1] = {(u, v, "-"): None}
+                            self.time_to_edge[t[1] + 1][(u, v, "-")] = None
 
                     app[-1][1] = t[1]
+                elif t[1] <= max_end:
+                    # the interaction is already covered by the last span
+                    pass
                 else:
                     app.append(t)
         else:
-            datadict['t'] = [t]
-
-        if e is not None:
-            span = range(t[0], t[1] + 1)
-            for idt in span:
-                if idt not in self.snapshots:
-                    self.snapshots[idt] = 1
-                else:
-                    self.snapshots[idt] += 1
-        else:
-            for idt in t:
-                if idt is not None:
-                    if idt not in self.snapshots:
-                        self.snapshots[idt] = 1
-                    else:
-                        self.snapshots[idt] += 1
-
-        self._adj[u][v] = datadict
-        self._adj[v][u] = datadict
+            datadict.t = [t]
+        # the spans may have been updated in place
+        datadict.reset_mask()
 
     def add_interactions_from(self, ebunch, t=None, e=None):
         """Add all the interaction in ebunch at time t.
@@ -463,9 +477,19 @@ class DynGraph(nx.Graph):
         if t is None:
             raise nx.NetworkXError(
                 "The t argument must be a specified.")
+        self._clear_caches()
+        span = self._interaction_span(t, e)
+
         # process ebunch
-        for ed in ebunch:
-            self.add_interaction(ed[0], ed[1], t, e)
+        count = 0
+        try:
+            for ed in ebunch:
+                self._insert_interaction(ed[0], ed[1], span[:], e)
+                count += 1
+        finally:
+            # the whole batch shares the same span: account for it at once
+            if count > 0:
+                self._account_interactions(span, e, count)
 
     def number_of_interactions(self, u=None, v=None, t=None):
         """Return the number of interaction between two nodes at time t.
@@ -592,7 +616,9 @@ class DynGraph(nx.Graph):
                 return list(self._adj[n])
             else:
                 if n in self._adj:
-                    return [i for i in self._adj[n] if self.__presence_test(n, i, t)]
+                    if self._use_csr():
+                        return self._frozen_neighbors(self._adj, 'adj', n, t)
+                    return [v for v, d in self._adj[n].items() if self._present(d, t)]
                 else:
                     return []
         except KeyError:
@@ -620,7 +646,9 @@ class DynGraph(nx.Graph):
             if t is None:
                 return iter(self._adj[n])
             else:
-                return iter([i for i in self._adj[n] if self.__presence_test(n, i, t)])
+                if self._use_csr():
+                    return iter(self._frozen_neighbors(self._adj, 'adj', n, t))
+                return iter([v for v, d in self._adj[n].items() if self._present(d, t)])
         except KeyError:
             raise nx.NetworkXError("The node %s is not in the graph." % (n,))
 
@@ -696,6 +724,15 @@ class DynGraph(nx.Graph):
         >>> list(G.degree_iter([0,1], t=0))
         [(0, 1), (1, 2)]
         """
+        if nbunch is None and t is not None:
+            nodes, index, src, dst, t_start, t_end = self._snapshot_table()
+            # self loops contribute a single neighbor
+            deg = snapshot_degree(src, dst, t_start, t_end, t, len(nodes), loops_once=True)
+            for n in self._adj:
+                i = index.get(n)
+                yield n, 0 if i is None else int(deg[i])
+            return
+
         if nbunch is None:
             nodes_nbrs = self._adj.items()
         else:
@@ -707,11 +744,7 @@ class DynGraph(nx.Graph):
                 yield n, deg
         else:
             for n, nbrs in nodes_nbrs:
-                edges_t = len([v for v in nbrs.keys() if self.__presence_test(n, v, t)])
-                if edges_t > 0:
-                    yield n, edges_t
-                else:
-                    yield n, 0
+                yield n, sum(1 for d in nbrs.values() if self._present(d, t))
 
     def size(self, t=None):
         """Return the number of edges at time t.
@@ -739,8 +772,24 @@ class DynGraph(nx.Graph):
         >>> G.size(t=0)
         3
         """
-        s = sum(self.degree(t=t).values()) / 2
-        return int(s)
+        if t is None:
+            if isinstance(self._adj, dict):
+                # as in the degree sum, a self loop only counts for half an interaction
+                loops = self._number_of_loops
+                return self._number_of_pairs - loops + loops // 2
+            # subgraph views filter the adjacency: the counters do not describe them
+            s = sum(self.degree(t=t).values()) / 2
+            return int(s)
+
+        def count():
+            # spans of the same interaction are disjoint: at most one of them covers t.
+            # As in the degree sum, a self loop only counts for half an interaction
+            _, _, src, dst, t_start, t_end = self._snapshot_table()
+            mask = (t_start <= t) & (t <= t_end)
+            loops = int(np.count_nonzero(mask & (src == dst)))
+            return int(np.count_nonzero(mask)) - loops + loops // 2
+
+        return self._cached(('size', t), count)
 
     def number_of_nodes(self, t=None):
         """Return the number of nodes in the t snpashot of a dynamic graph.
@@ -771,7 +820,7 @@ class DynGraph(nx.Graph):
         if t is None:
             return len(self._node)
         else:
-            nds = sum([1 for n in self.degree(t=t).values() if n > 0])
+            nds = sum(1 for _ in self.__active_nodes(t))
             return nds
 
     def avg_number_of_nodes(self):
@@ -884,7 +933,7 @@ class DynGraph(nx.Graph):
         nlist = list(nodes)
         v = nlist[0]
         interaction = ((v, n) for n in nlist[1:])
-        self.add_interactions_from(interaction, t)
+        self._add_pairs(interaction, t)
 
     def add_path(self, nodes, t=None):
         """Add a path at time t.
@@ -905,9 +954,7 @@ class DynGraph(nx.Graph):
         >>> G = dn.DynGraph()
         >>> G.add_path([0,1,2,3], t=0)
         """
-        nlist = list(nodes)
-        interaction = zip(nlist[:-1], nlist[1:])
-        self.add_interactions_from(interaction, t)
+        self._add_pairs(pairwise(nodes), t)
 
     def add_cycle(self, nodes, t=None):
         """Add a cycle at time t.
@@ -929,8 +976,8 @@ class DynGraph(nx.Graph):
         >>> G.add_cycle([0,1,2,3], t=0)
         """
         nlist = list(nodes)
-        interaction = zip(nlist, nlist[1:] + [nlist[0]])
-        self.add_interactions_from(interaction, t)
+        interaction = chain(pairwise(nlist), [(nlist[-1], nlist[0])])
+        self._add_pairs(interaction, t)
 
     def to_directed(self, **kwargs):
         """Return a directed representation of the graph.
@@ -1005,10 +1052,9 @@ class DynGraph(nx.Graph):
         >>> list(G.stream_interactions())
         [(0, 1, '+', 0), (1, 2, '+', 0), (2, 3, '+', 0), (3, 4, '+', 1), (4, 5, '+', 1), (5, 6, '+', 1)]
         """
-        timestamps = sorted(self.time_to_edge.keys())
-        for t in timestamps:
-            for e in self.time_to_edge[t]:
-                yield e[0], e[1], e[2], t
+        for t in self._stream_ids():
+            for u, v, op in self.time_to_edge[t]:
+                yield u, v, op, t
 
     def time_slice(self, t_from, t_to=None):
         """Return an new graph containing nodes and interactions present in [t_from, t_to].
@@ -1039,34 +1085,13 @@ class DynGraph(nx.Graph):
             >>> H.interactions()
             [(0, 1), (1, 2), (1, 3), (0, 4), (4, 5), (5, 6)]
         """
-        # create new graph and copy subgraph into it
-        H = self.__class__()
         if t_to is not None:
             if t_to < t_from:
                 raise ValueError("Invalid range: t_to must be grater that t_from")
         else:
             t_to = t_from
 
-        for u, v, ts in self.interactions_iter():
-            i_to = t_to
-            f_from = t_from
-            for a, b in ts['t']:
-                if i_to < a or f_from > b:
-                    continue
-
-                if f_from >= a and i_to <= b:
-                    H.add_interaction(u, v, f_from, i_to)
-                elif a >= f_from and i_to <= b:
-                    H.add_interaction(u, v, a, i_to)
-                elif f_from>=a and b<= i_to:
-                    H.add_interaction(u, v, f_from, b)
-                elif f_from <= a and b <= i_to:
-                    H.add_interaction(u, v, a, b)
-
-        for n in H.nodes():
-            H._node[n] = self._node[n]
-
-        return H
+        return self._time_slice(t_from, t_to)
 
     def update_node_attr(self, n, **data):
         """Updates the attributes of a specified node.
@@ -1137,7 +1162,7 @@ class DynGraph(nx.Graph):
             >>> G.temporal_snapshots_ids()
             [0, 1, 2]
         """
-        return sorted(self.snapshots.keys())
+        return list(self._snapshot_ids())
 
     def interactions_per_snapshots(self, t=None):
         """Return the number of interactions within snapshot t.
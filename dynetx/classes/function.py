@@ -1,10 +1,10 @@
 from __future__ import division
 
-from dynetx.utils import not_implemented
-from collections import Counter
+from dynetx.utils import not_implemented, pairwise
 from itertools import chain
 
 import networkx as nx
+import numpy as np
 
 
 __author__ = 'Giulio Rossetti'
@@ -308,8 +308,9 @@ def degree_histogram(G, t=None):
         Note: the bins are width one, hence len(list) can be large
         (Order(number_of_edges))
         """
-    counts = Counter(d for n, d in G.degree(t=t).items())
-    return [counts.get(i, 0) for i in range(max(counts) + 1)]
+    degrees = G.degree(t=t)
+    counts = np.bincount(np.fromiter(degrees.values(), dtype=np.intp, count=len(degrees)))
+    return counts.tolist()
 
 
 def is_directed(G):
@@ -338,6 +339,10 @@ def freeze(G):
         -----
         To "unfreeze" a graph you must make a copy by creating a new graph object.
 
+        Once frozen, the neighbors of a node in a given snapshot are retrieved scanning
+        a contiguous (CSR) copy of the interaction spans, built on the first query following
+        an update.
+
         See Also
         --------
         is_frozen
@@ -429,9 +434,7 @@ def add_path(G, nodes, t, **attr):
             >>> G = dn.DynGraph()
             >>> dn.add_path(G, [0,1,2,3], t=0)
             """
-    nlist = list(nodes)
-    edges = zip(nlist[:-1], nlist[1:])
-    G.add_interactions_from(edges, t, **attr)
+    G.add_interactions_from(pairwise(nodes), t, **attr)
 
 
 def add_cycle(G, nodes, t, **attr):
@@ -459,7 +462,7 @@ def add_cycle(G, nodes, t, **attr):
             >>> dn.add_cycle(G, [0,1,2,3], t=0)
             """
     nlist = list(nodes)
-    edges = zip(nlist, nlist[1:] + [nlist[0]])
+    edges = chain(pairwise(nlist), [(nlist[-1], nlist[0])])
     G.add_interactions_from(edges, t, **attr)
 
 
@@ -499,7 +502,15 @@ def create_empty_copy(G, with_data=True):
         Graph and edge data is not propagated to the new graph.
         """
     H = G.__class__()
-    H.add_nodes_from(G.nodes(data=with_data))
+    # H is new: fill its node and adjacency dicts at once instead of adding the nodes one by one
+    factory = H.adjlist_inner_dict_factory
+    if with_data:
+        H._node.update((n, dict(d)) for n, d in G._node.items())
+    else:
+        H._node.update((n, {}) for n in G._node)
+    H._adj.update((n, factory()) for n in H._node)
+    if H.is_directed():
+        H._pred.update((n, factory()) for n in H._node)
     if with_data:
         H.graph.update(G.graph)
     return H
@@ -521,21 +532,22 @@ def set_node_attributes(G, values, name=None):
            applied to every node in `G`.
 
         """
+    node = G._node
     # Set node attributes based on type of `values`
     if name is not None:  # `values` must not be a dict of dict
         try:  # `values` is a dict
             for n, v in values.items():
                 try:
-                    G._node[n][name] = values[n]
+                    node[n][name] = v
                 except KeyError:
                     pass
         except AttributeError:  # `values` is a constant
-            for n in G:
-                G._node[n][name] = values
+            for d in node.values():
+                d[name] = values
     else:  # `values` must be dict of dict
         for n, d in values.items():
             try:
-                G._node[n].update(d)
+                node[n].update(d)
             except KeyError:
                 pass
 
@@ -591,7 +603,8 @@ def all_neighbors(graph, node, t=None):
             Iterator of neighbors
     """
     if graph.is_directed():
-        values = chain(graph.predecessors(node, t=t), graph.successors(node, t=t))
+        # chain the neighbor iterators: predecessors and successors are not copied into lists first
+        values = chain(graph.predecessors_iter(node, t=t), graph.successors_iter(node, t=t))
     else:
         values = graph.neighbors(node, t=t)
     return values
@@ -617,13 +630,21 @@ def non_neighbors(graph, node, t=None):
         non_neighbors : iterator
             Iterator of nodes in the graph that are not neighbors of the node.
         """
-    if graph.is_directed():
-        values = chain(graph.predecessors(node, t=t), graph.successors(node, t=t))
+    if t is None:
+        # the flattened neighborhood is the adjacency itself: no need to copy it
+        try:
+            if graph.is_directed():
+                nbors = graph._succ[node].keys() | graph._pred[node].keys()
+            else:
+                nbors = graph._adj[node]
+        except KeyError:
+            raise nx.NetworkXError("The node %s is not in the graph." % (node,))
+    elif graph.is_directed():
+        nbors = set(chain(graph.predecessors(node, t=t), graph.successors(node, t=t)))
     else:
-        values = graph.neighbors(node, t=t)
+        nbors = set(graph.neighbors(node, t=t))
 
-    nbors = set(values) | {node}
-    return (nnode for nnode in graph if nnode not in nbors)
+    return (nnode for nnode in graph if nnode != node and nnode not in nbors)
 
 
 def non_interactions(graph, t=None):
@@ -652,8 +673,10 @@ def non_interactions(graph, t=None):
     nodes = set(graph)
     while nodes:
         u = nodes.pop()
-        for v in nodes - set(graph[u]):
-            yield u, v
+        nbrs = graph._adj[u]
+        for v in nodes:
+            if v not in nbrs:
+                yield u, v
 
 
 def is_empty(G):
@@ -674,9 +697,14 @@ def is_empty(G):
         Notes
         -----
         An empty graph can have nodes but not edges. The empty graph with zero
-        nodes is known as the null graph. This is an O(n) operation where n is the
-        number of nodes in the graph.
+        nodes is known as the null graph. DyNetx graphs count their interacting
+        node pairs, so this is an O(1) operation; for other graphs and for
+        subgraph views it is O(n), where n is the number of nodes in the graph.
         """
+    pairs = getattr(G, '_number_of_pairs', None)
+    # subgraph views filter the adjacency: the counter does not describe them
+    if pairs is not None and isinstance(G._adj, dict):
+        return pairs == 0
     return not any(G.adj.values())
 
 
@@ -718,7 +746,7 @@ def time_slice(G, t_from, t_to=None):
     return G.time_slice(t_from, t_to)
 
 
-def stream_interactions(G):
+def stream_interactions(G, as_array=False):
     """Generate a temporal ordered stream of interactions.
 
             Parameters
@@ -727,11 +755,15 @@ def stream_interactions(G):
             G : graph
                 A DyNetx graph.
 
+            as_array : bool, optional (default=False)
+                If True the stream is returned as a NumPy record array.
+
             Returns
             -------
 
             nd_iter : an iterator
                 The iterator returns a 4-tuples of (node, node, op, timestamp).
+                If as_array is True, a record array with fields src, dst, op and t.
 
             Examples
             --------
@@ -742,6 +774,8 @@ def stream_interactions(G):
             >>> list(dn.stream_interactions(G))
             [(0, 1, '+', 0), (1, 2, '+', 0), (2, 3, '+', 0), (3, 4, '+', 1), (4, 5, '+', 1), (5, 6, '+', 1)]
             """
+    if as_array:
+        return G.stream_interactions_array()
     return G.stream_interactions()
 
 
@@ -0,0 +1,114 @@
+"""Compact storage for the data attached to each interaction.
+
+Every interaction of a dynamic graph carries, at least, the list of its
+presence spans under the 't' key. Storing it in a plain dict costs a full hash
+table per interaction: InteractionData keeps the spans in a slot and only
+allocates a dict when other attributes are set.
+
+For the snapshots in [0, 64) the presence of an interaction can also be read from
+a bit mask, computed from the spans on first use.
+"""
+from collections.abc import MutableMapping
+
+# presence masks cover the snapshots 0 .. MASK_BITS - 1
+MASK_BITS = 64
+
+__author__ = 'Giulio Rossetti'
+__license__ = "BSD-Clause-2"
+__email__ = "giulio.rossetti@gmail.com"
+
+
+class InteractionData(MutableMapping):
+    """Dict-like container of the attributes of an interaction.
+
+    The presence spans are also exposed as the ``t`` attribute (None if not set yet).
+
+    Examples
+    --------
+    >>> d = InteractionData(t=[[0, 2]])
+    >>> d['t']
+    [[0, 2]]
+    >>> dict(d)
+    {'t': [[0, 2]]}
+    """
+
+    __slots__ = ('t', '_attr', '_mask')
+
+    def __init__(self, *args, **kwargs):
+        self.t = None
+        self._attr = None
+        self._mask = None
+        if args or kwargs:
+            self.update(*args, **kwargs)
+
+    def __getitem__(self, key):
+        if key == 't':
+            if self.t is not None:
+                return self.t
+        elif self._attr is not None:
+            return self._attr[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 't':
+            self.t = value
+            self._mask = None
+        else:
+            if self._attr is None:
+                self._attr = {}
+            self._attr[key] = value
+
+    def __delitem__(self, key):
+        if key == 't':
+            if self.t is None:
+                raise KeyError(key)
+            self.t = None
+            self._mask = None
+        elif self._attr is not None:
+            del self._attr[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key == 't':
+            return self.t is not None
+        return self._attr is not None and key in self._attr
+
+    def __iter__(self):
+        if self.t is not None:
+            yield 't'
+        if self._attr is not None:
+            for key in self._attr:
+                yield key
+
+    def __len__(self):
+        return (self.t is not None) + (len(self._attr) if self._attr is not None else 0)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def copy(self):
+        """Return a shallow copy, as dict.copy() would."""
+        return self.__class__(self)
+
+    def presence_mask(self):
+        """Return an int whose i-th bit is set if a span covers snapshot i, for 0 <= i < 64.
+
+        The mask is cached: call reset_mask() after updating the spans in place.
+        None is returned if the spans are not integer ones.
+        """
+        if self._mask is None:
+            mask = 0
+            for start, end in self.t:
+                if type(start) is not int or type(end) is not int:
+                    mask = -1  # not computable
+                    break
+                start, end = max(start, 0), min(end, MASK_BITS - 1)
+                if start <= end:
+                    mask |= (1 << (end + 1)) - (1 << start)
+            self._mask = mask
+        return None if self._mask < 0 else self._mask
+
+    def reset_mask(self):
+        """Drop the cached presence mask."""
+        self._mask = None
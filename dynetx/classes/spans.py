@@ -0,0 +1,356 @@
+"""Span bookkeeping shared by the dynamic graph classes.
+
+Every interaction stores the sorted, disjoint [start, end] spans of its
+presence. Snapshot-wide queries (degrees, sizes, time slices) are answered
+from flat NumPy arrays built from these spans on first use: they are kept in
+a single cache, dropped at each update of the graph.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from operator import index
+
+import numpy as np
+
+from dynetx.classes.interaction import MASK_BITS
+from dynetx.utils.kernels import slice_spans
+
+__author__ = 'Giulio Rossetti'
+__license__ = "BSD-Clause-2"
+__email__ = "giulio.rossetti@gmail.com"
+
+
+class SpanTableMixin(object):
+    """Span tables, snapshot counters and event stream of DynGraph and DynDiGraph.
+
+    The graph classes provide the adjacency (``_adj``, shared by the successors of
+    a directed graph), ``edge_removal`` and ``_insert_interaction``, and call
+    ``_reset_interactions`` to set up the event stream and the counters.
+    """
+
+    def _reset_interactions(self):
+        """Forget every interaction: events, snapshot counters, interaction counters and caches."""
+        self.time_to_edge = defaultdict(dict)
+        self._snapshots = {}
+        self._snapshots_delta = defaultdict(int)
+        self._number_of_pairs = 0
+        self._cache = {}
+
+    def clear(self):
+        """Remove all nodes and interactions from the graph.
+
+        Examples
+        --------
+        >>> import dynetx as dn
+        >>> G = dn.DynGraph()
+        >>> G.add_path([0,1,2], t=0)
+        >>> G.clear()
+        >>> G.interactions(t=0)
+        []
+        """
+        super(SpanTableMixin, self).clear()
+        self._reset_interactions()
+
+    def clear_edges(self):
+        """Remove all interactions from the graph without altering its nodes.
+
+        Examples
+        --------
+        >>> import dynetx as dn
+        >>> G = dn.DynGraph()
+        >>> G.add_path([0,1,2], t=0)
+        >>> G.clear_edges()
+        >>> G.size(), G.number_of_nodes()
+        (0, 3)
+        """
+        super(SpanTableMixin, self).clear_edges()
+        self._reset_interactions()
+
+    def _clear_caches(self):
+        """Drop the structures derived from the interactions: they are rebuilt on demand."""
+        if self._cache:
+            # only when something was built: most updates follow other updates
+            self._cache = {}
+
+    def _cached(self, key, build):
+        """Return the derived structure key, calling build() if it is not cached."""
+        if not isinstance(self._adj, dict):
+            # subgraph views filter the adjacency of their graph: nothing drops their caches when it changes
+            return build()
+        cache = self._cache
+        if key not in cache:
+            cache[key] = build()
+        return cache[key]
+
+    @property
+    def snapshots(self):
+        """Dictionary mapping each snapshot id to its interaction counter.
+
+        Interactions spanning several snapshots are recorded as a difference array
+        (+1 where they appear, -1 where they vanish) and folded into the counters
+        only when these are read.
+        """
+        delta = self._snapshots_delta
+        if delta:
+            tids = sorted(delta)
+            active = 0
+            for tid, nxt in zip(tids, tids[1:]):
+                active += delta[tid]
+                if active > 0:
+                    for idt in range(tid, nxt):
+                        self._snapshots[idt] = self._snapshots.get(idt, 0) + active
+            delta.clear()
+        return self._snapshots
+
+    def _present(self, data, t):
+        """Return True if the interaction holding data is present at time t."""
+        spans = data.t
+        if self.edge_removal:
+            if type(t) is int and 0 <= t < MASK_BITS:
+                mask = data.presence_mask()
+                if mask is not None:
+                    return (mask >> t) & 1 == 1
+            if spans[0][0] <= t <= spans[-1][1]:
+                # spans are sorted and disjoint: locate the last one starting before t
+                i = bisect_left(spans, [t])
+                if i < len(spans) and spans[i][0] == t:
+                    # a span [t, t - 1] (added with e == t) is empty
+                    return t <= spans[i][1]
+                return i > 0 and t <= spans[i - 1][1]
+        else:
+            if spans[0][0] <= t <= self._snapshot_ids()[-1]:
+                return True
+
+        return False
+
+    def _interaction_span(self, t, e):
+        """Return the [start, end] span described by the t and e arguments of add_interaction.
+
+        Raises TypeError, before anything is stored, if e is given and the span bounds are not integers.
+        """
+        if not isinstance(t, list):
+            span = [t, t] if e is None or not self.edge_removal else [t, e - 1]
+        else:
+            # the span is stored (and possibly updated) as is: never alias the caller list
+            span = t[:]
+            if e is not None and self.edge_removal:
+                span[1] = e - 1
+
+        if e is not None:
+            # the span is accounted snapshot by snapshot, see the snapshots property
+            index(span[0])
+            index(span[1])
+        return span
+
+    def _account_interactions(self, t, e, count=1):
+        """Record count interactions on span t in the snapshot counters."""
+        if e is not None:
+            # spans are accounted lazily, see the snapshots property
+            if t[0] <= t[1]:
+                self._snapshots_delta[t[0]] += count
+                self._snapshots_delta[t[1] + 1] -= count
+        else:
+            snapshots = self._snapshots
+            for idt in t:
+                if idt is not None:
+                    snapshots[idt] = snapshots.get(idt, 0) + count
+
+    def _add_pairs(self, pairs, t):
+        """Add the (u, v) pairs at snapshot t: shared by the add_star, add_path and add_cycle shortcuts."""
+        if t is None or isinstance(t, list):
+            self.add_interactions_from(pairs, t)
+            return
+
+        self._clear_caches()
+        insert = self._insert_interaction
+        count = 0
+        try:
+            for u, v in pairs:
+                insert(u, v, [t, t], None)
+                count += 1
+        finally:
+            if count > 0:
+                self._account_interactions([t, t], None, count)
+
+    def _span_table(self):
+        """Return the interaction spans as flat arrays, rebuilding them after each update.
+
+        Every span of every interaction is a row of the table: the i-th row links
+        nodes[src[i]] to nodes[dst[i]] within [t_start[i], t_end[i]]. The interactions
+        of an undirected graph are listed once.
+        """
+        return self._cached('spans', self.__build_span_table)
+
+    def __build_span_table(self):
+        directed = self.is_directed()
+        index = {n: i for i, n in enumerate(self._adj)}
+        src, dst, t_start, t_end = [], [], [], []
+        seen = {}
+        for u, nbrs in self._adj.items():
+            iu = index[u]
+            for v, data in nbrs.items():
+                if v in seen:
+                    continue
+                iv = index[v]
+                for span in data.t:
+                    src.append(iu)
+                    dst.append(iv)
+                    t_start.append(span[0])
+                    t_end.append(span[1])
+            if not directed:
+                seen[u] = 1
+
+        return (list(index), index, np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64),
+                np.array(t_start), np.array(t_end))
+
+    def _spans_by_start(self):
+        """Return the rows of the span table sorted by start time, along with the sorted start times."""
+        def build():
+            t_start = self._span_table()[4]
+            order = np.argsort(t_start, kind="stable")
+            return order, t_start[order]
+
+        return self._cached('span_order', build)
+
+    def _window_spans(self, t_from, t_to):
+        """Return the span rows intersecting [t_from, t_to] and their clipped spans."""
+        _, _, _, _, t_start, t_end = self._span_table()
+        # the spans starting within t_to are a prefix of the start order: bisect its end
+        order, starts = self._spans_by_start()
+        selected = np.sort(order[:np.searchsorted(starts, t_to, side="right")])
+        # keep those not over before t_from, in table order, and clip them to the range
+        return slice_spans(selected, t_start, t_end, t_from, t_to)
+
+    def _snapshot_table(self):
+        """Return the presence of the interactions as flat arrays, rebuilding them after each update.
+
+        Same layout of the span table: with edge removal the rows are the spans themselves,
+        otherwise each interaction has a single row, from its first appearance to the last snapshot.
+        """
+        def build():
+            nodes, index, src, dst, t_start, t_end = self._span_table()
+            if self.edge_removal or len(src) == 0:
+                return nodes, index, src, dst, t_start, t_end
+            # the spans of an interaction are contiguous rows: keep the first one
+            first = np.ones(len(src), dtype=bool)
+            first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+            last = max(self.snapshots)
+            return nodes, index, src[first], dst[first], t_start[first], np.full(np.count_nonzero(first), last)
+
+        return self._cached('table', build)
+
+    def _neighbor_csr(self, adj, which):
+        """Return the interaction spans of each node in CSR layout (see freeze).
+
+        The spans of node nodes[i] are the rows indptr[i]:indptr[i + 1], sorted as its
+        adjacency: the k-th row reaches nodes[indices[k]] within [t_start[k], t_end[k]].
+        """
+        def build():
+            index = {n: i for i, n in enumerate(adj)}
+            indptr, indices, t_start, t_end = [0], [], [], []
+            if not self.edge_removal and len(self.snapshots) > 0:
+                last = max(self.snapshots)
+            for u, nbrs in adj.items():
+                for v, data in nbrs.items():
+                    spans = data.t
+                    if self.edge_removal:
+                        for span in spans:
+                            indices.append(index[v])
+                            t_start.append(span[0])
+                            t_end.append(span[1])
+                    else:
+                        indices.append(index[v])
+                        t_start.append(spans[0][0])
+                        t_end.append(last)
+                indptr.append(len(indices))
+
+            return (list(index), index, np.array(indptr, dtype=np.int64),
+                    np.array(indices, dtype=np.int64), np.array(t_start), np.array(t_end))
+
+        return self._cached(('csr', which), build)
+
+    def _use_csr(self):
+        """Return True if the neighbor queries scan the CSR layout: the graph is frozen and owns its adjacency.
+
+        Subgraph views are frozen as well, but they filter the adjacency of a graph that can still change.
+        """
+        return getattr(self, 'frozen', False) and isinstance(self._adj, dict)
+
+    def _frozen_neighbors(self, adj, which, n, t):
+        """Return the neighbors of n in snapshot t scanning its contiguous CSR rows."""
+        nodes, index, indptr, indices, t_start, t_end = self._neighbor_csr(adj, which)
+        i = index[n]
+        lo, hi = indptr[i], indptr[i + 1]
+        mask = (t_start[lo:hi] <= t) & (t <= t_end[lo:hi])
+        return [nodes[j] for j in indices[lo:hi][mask].tolist()]
+
+    def _time_slice(self, t_from, t_to):
+        """Return a new graph of the same class holding the interactions of [t_from, t_to], see time_slice."""
+        H = self.__class__()
+        nodes, _, src, dst, _, _ = self._span_table()
+        selected, t_start, t_end = self._window_spans(t_from, t_to)
+
+        # each clipped span [a, b] is added as add_interaction(u, v, a, e=b) would, i.e. on [a, b - 1].
+        # H is new: its caches are empty, no need to drop them per interaction
+        insert = H._insert_interaction
+        rows = zip(src[selected].tolist(), dst[selected].tolist(), t_start.tolist(), t_end.tolist())
+        for iu, iv, a, b in rows:
+            insert(nodes[iu], nodes[iv], [a, b - 1], b)
+
+        # the snapshot counters are updated once for the whole slice
+        live = t_start <= t_end - 1
+        delta = H._snapshots_delta
+        # as in add_interaction, spans covering several snapshots need integer bounds
+        for tid, count in zip(*np.unique(t_start[live], return_counts=True)):
+            delta[index(tid.item())] += int(count)
+        for tid, count in zip(*np.unique(t_end[live], return_counts=True)):
+            delta[index(tid.item())] -= int(count)
+
+        node, sliced = self._node, H._node
+        for n in sliced:
+            sliced[n] = node[n]
+
+        return H
+
+    def _stream_ids(self):
+        """Return the sorted event timestamps: they are only re-sorted after an update."""
+        return self._cached('stream_ids', lambda: sorted(self.time_to_edge.keys()))
+
+    def _snapshot_ids(self):
+        """Return the sorted snapshot ids, caching them until the next update."""
+        return self._cached('snapshot_ids', lambda: sorted(self.snapshots.keys()))
+
+    def stream_interactions_array(self):
+        """Return the temporal ordered stream of interactions as a NumPy record array.
+
+        Returns
+        -------
+        stream : numpy.recarray
+            One record per event of stream_interactions, with fields src, dst, op and t.
+
+        Examples
+        --------
+        >>> import dynetx as dn
+        >>> G = dn.DynGraph()
+        >>> G.add_path([0,1,2], t=0)
+        >>> G.add_interaction(2, 3, t=1)
+        >>> s = G.stream_interactions_array()
+        >>> s.src.tolist(), s.t.tolist()
+        ([0, 1, 2], [0, 0, 1])
+        """
+        src, dst, op, ts = [], [], [], []
+        for t in self._stream_ids():
+            events = self.time_to_edge[t]
+            if not events:
+                continue
+            us, vs, ops = zip(*events)
+            src.extend(us)
+            dst.extend(vs)
+            op.extend(ops)
+            ts.extend([t] * len(events))
+
+        # fill the node columns item by item: np.array would unpack tuple labels into extra dimensions
+        src_col, dst_col = np.empty(len(src), dtype=object), np.empty(len(dst), dtype=object)
+        for i, (u, v) in enumerate(zip(src, dst)):
+            src_col[i], dst_col[i] = u, v
+
+        return np.rec.fromarrays([src_col, dst_col, np.array(op, dtype='U1'), np.array(ts)], names='src,dst,op,t')
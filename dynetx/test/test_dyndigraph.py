@@ -147,6 +147,37 @@ class DynDiGraphTestCase(unittest.TestCase):
         its = g.number_of_interactions(0, 1, 6)
         self.assertEqual(its, 0)
 
+    def test_interaction_spans(self):
+        g = dn.DynDiGraph()
+        g.add_interaction(1, 2, 2, e=6)
+        g.add_interaction(1, 2, 3, e=5)
+        g.add_interaction(1, 2, 10, e=20)
+        g.add_interaction(1, 2, 30)
+
+        self.assertEqual(g._adj[1][2]['t'], [[2, 5], [10, 19], [30, 30]])
+        for t in [2, 4, 5, 10, 15, 19, 30]:
+            self.assertEqual(g.has_interaction(1, 2, t), True)
+        for t in [0, 1, 6, 9, 20, 29, 31]:
+            self.assertEqual(g.has_interaction(1, 2, t), False)
+
+        span = [40, 45]
+        g.add_interaction(3, 4, span, e=42)
+        self.assertEqual(span, [40, 45])
+        self.assertEqual(g._adj[3][4]['t'], [[40, 41]])
+
+    def test_empty_span(self):
+        # e == t leaves an empty span, out of the range covered by the presence mask
+        g = dn.DynDiGraph()
+        g.add_interaction(0, 1, t=100, e=100)
+        g.add_interaction(0, 1, t=200)
+
+        self.assertEqual(g.has_interaction(0, 1, 100), False)
+        self.assertEqual(g.neighbors(0, t=100), [])
+        self.assertEqual(g.nodes(t=100), [])
+        self.assertEqual(g.degree(t=100), {0: 0, 1: 0})
+        self.assertEqual(g.has_interaction(0, 1, 200), True)
+        self.assertEqual(g.neighbors(0, t=200), [1])
+
     def test_has_interaction(self):
         g = dn.DynDiGraph()
         g.add_interaction(0, 1, 5)
@@ -313,6 +344,56 @@ class DynDiGraphTestCase(unittest.TestCase):
         ng = g.out_degree(4, 0)
         self.assertEqual(ng, 0)
 
+    def test_snapshot_degree(self):
+        for removal in [True, False]:
+            g = dn.DynDiGraph(edge_removal=removal)
+            g.add_interaction(0, 1, 0, e=3)
+            g.add_interaction(1, 2, 2)
+            g.add_interaction(2, 2, 2, e=5)
+            g.add_interaction(0, 1, 6)
+            g.add_node(7)
+            nds = g.nodes()
+            for t in range(0, 8):
+                self.assertDictEqual(g.degree(t=t), g.degree(nds, t=t))
+                active = [n for n, d in g.degree(t=t).items() if d > 0]
+                self.assertListEqual(g.nodes(t=t), active)
+                self.assertEqual(g.number_of_nodes(t=t), len(active))
+                self.assertDictEqual(g.in_degree(t=t), g.in_degree(nds, t=t))
+                self.assertDictEqual(g.out_degree(t=t), g.out_degree(nds, t=t))
+
+    def test_snapshot_interactions(self):
+        g = dn.DynDiGraph()
+        g.add_interaction(0, 1, 0, e=4)
+        self.assertEqual(g.interactions(t=2), [(0, 1, {'t': [2]})])
+        g.add_interaction(1, 2, 2)
+        self.assertEqual(sorted((u, v) for u, v, _ in g.interactions(t=2)), [(0, 1), (1, 2)])
+        self.assertEqual(g.interactions(t=3), [(0, 1, {'t': [3]})])
+        self.assertEqual(g.interactions(t=5), [])
+
+    def test_bulk_interactions(self):
+        for e in [None, 4]:
+            g = dn.DynDiGraph()
+            g.add_interactions_from([(0, 1), (1, 2), (2, 3)], t=1, e=e)
+            h = dn.DynDiGraph()
+            for u, v in [(0, 1), (1, 2), (2, 3)]:
+                h.add_interaction(u, v, t=1, e=e)
+            self.assertDictEqual(g.snapshots, h.snapshots)
+            self.assertEqual(g.interactions(), h.interactions())
+            self.assertEqual(dict(g.time_to_edge), dict(h.time_to_edge))
+
+    def test_size(self):
+        g = dn.DynDiGraph()
+        g.add_path([0, 1, 2, 3], t=0)
+        g.add_interaction(3, 3, t=1, e=3)
+        g.add_interaction(0, 3, t=2)
+        self.assertEqual(g.size(), 5)
+        self.assertEqual(g.size(t=0), 3)
+        self.assertEqual(g.size(t=1), 1)
+        self.assertEqual(g.size(t=2), 2)
+        g.add_interaction(1, 2, t=2)
+        self.assertEqual(g.size(t=2), 3)
+        self.assertEqual(g.size(t=5), 0)
+
     def test_number_of_nodes(self):
         g = dn.DynDiGraph()
         g.add_interaction(0, 1, 5)
@@ -351,6 +432,11 @@ class DynDiGraphTestCase(unittest.TestCase):
         self.assertIsInstance(h, dn.DynDiGraph)
         self.assertEqual(h.number_of_nodes(), 5)
         self.assertEqual(h.number_of_interactions(), 4)
+        # each clipped span [5, 5] is added as add_interaction(u, v, 5, e=5) would
+        self.assertEqual(sorted(h.stream_interactions()),
+                         sorted((0, v, op, 5) for v in [1, 2, 3, 4] for op in '+-'))
+        self.assertIn(1, h._succ[0])
+        self.assertNotIn(1, h._pred[0])
 
         h = g.time_slice(5, 5)
         self.assertIsInstance(h, dn.DynDiGraph)
@@ -401,6 +487,19 @@ class DynDiGraphTestCase(unittest.TestCase):
         tsd = g.interactions_per_snapshots(t=0)
         self.assertEqual(tsd, 0)
 
+    def test_span_snapshots(self):
+        g = dn.DynDiGraph()
+        g.add_interaction(0, 1, 2, e=5)
+        g.add_interaction(1, 2, 3, e=7)
+        self.assertEqual(g.temporal_snapshots_ids(), [2, 3, 4, 5, 6])
+        self.assertDictEqual(g.interactions_per_snapshots(), {2: 0.5, 3: 1, 4: 1, 5: 0.5, 6: 0.5})
+
+        g.add_interaction(2, 3, 4)
+        g.add_interaction(3, 4, 9, e=11)
+        self.assertEqual(g.temporal_snapshots_ids(), [2, 3, 4, 5, 6, 9, 10])
+        self.assertEqual(g.interactions_per_snapshots(t=4), 2)
+        self.assertEqual(g.interactions_per_snapshots(t=8), 0)
+
     def test_inter_out_event_time(self):
         g = dn.DynDiGraph()
         g.add_interaction(0, 1, 2)
@@ -487,6 +586,10 @@ class DynDiGraphTestCase(unittest.TestCase):
                 (1, 5, '-', 3), (1, 2, '-', 6), (1, 2, '+', 7), (1, 2, '-', 15), (1, 2, '+', 18)]
         self.assertEqual(sorted(sres), sorted(cres))
 
+        sarr = g.stream_interactions_array()
+        self.assertEqual(list(zip(sarr.src, sarr.dst, sarr.op, sarr.t)), sres)
+        self.assertEqual(len(dn.stream_interactions(g, as_array=True)), len(sres))
+
     def test_accumulative_growth(self):
         g = dn.DynDiGraph(edge_removal=False)
         g.add_interaction(1, 2, 2)
@@ -1,4 +1,5 @@
 import unittest
+import pickle
 import dynetx as dn
 
 
@@ -178,6 +179,69 @@ class DynGraphTestCase(unittest.TestCase):
         self.assertEqual(g.has_interaction(0, 1, 6), False)
         self.assertEqual(g.has_interaction(0, 1, 9), False)
 
+    def test_interaction_spans(self):
+        g = dn.DynGraph()
+        g.add_interaction(1, 2, 2, e=6)
+        g.add_interaction(1, 2, 3, e=5)
+        g.add_interaction(1, 2, 10, e=20)
+        g.add_interaction(1, 2, 30)
+
+        self.assertEqual(g._adj[1][2]['t'], [[2, 5], [10, 19], [30, 30]])
+        for t in [2, 4, 5, 10, 15, 19, 30]:
+            self.assertEqual(g.has_interaction(1, 2, t), True)
+        for t in [0, 1, 6, 9, 20, 29, 31]:
+            self.assertEqual(g.has_interaction(1, 2, t), False)
+
+        span = [40, 45]
+        g.add_interaction(3, 4, span, e=42)
+        self.assertEqual(span, [40, 45])
+        self.assertEqual(g._adj[3][4]['t'], [[40, 41]])
+
+        with self.assertRaises(TypeError):
+            g.add_interaction(5, 6, 1.5, e=3.5)
+        self.assertNotIn(5, g)
+        self.assertEqual(g.temporal_snapshots_ids()[:3], [2, 3, 4])
+
+    def test_empty_span(self):
+        # e == t leaves an empty span, out of the range covered by the presence mask
+        g = dn.DynGraph()
+        g.add_interaction(0, 1, t=100, e=100)
+        g.add_interaction(0, 1, t=200)
+
+        self.assertEqual(g.has_interaction(0, 1, 100), False)
+        self.assertEqual(g.neighbors(0, t=100), [])
+        self.assertEqual(g.nodes(t=100), [])
+        self.assertEqual(g.degree(t=100), {0: 0, 1: 0})
+        self.assertEqual(g.has_interaction(0, 1, 200), True)
+        self.assertEqual(g.neighbors(0, t=200), [1])
+
+    def test_presence_mask(self):
+        g = dn.DynGraph()
+        g.add_interaction(1, 2, 2, e=6)
+        g.add_interaction(1, 2, 60, e=70)
+        self.assertEqual(g.adj[1][2].presence_mask(), (0b1111 << 2) | (0b1111 << 60))
+        for t in [2, 5, 60, 63, 64, 69]:
+            self.assertEqual(g.has_interaction(1, 2, t), True)
+        for t in [0, 1, 6, 59, 70]:
+            self.assertEqual(g.has_interaction(1, 2, t), False)
+        # in place updates drop the cached mask
+        g.add_interaction(1, 2, 70)
+        self.assertEqual(g.has_interaction(1, 2, 70), True)
+        g.add_interaction(3, 4, 1.5)
+        self.assertEqual(g.adj[3][4].presence_mask(), None)
+        self.assertEqual(g.has_interaction(3, 4, 1.5), True)
+
+    def test_repeated_updates(self):
+        g = dn.DynGraph()
+        for t in range(0, 5):
+            g.add_interaction(1, 2, t)
+        g.add_interaction(1, 2, 4)
+        g.add_interaction(1, 2, 8)
+        g.add_interaction(1, 2, 9)
+        # spans stay sorted and disjoint: updates extend or append, never re-sort
+        self.assertEqual(g._adj[1][2]['t'], [[0, 4], [8, 9]])
+        self.assertRaises(ValueError, g.add_interaction, 1, 2, 6)
+
     def test_neighbores(self):
         g = dn.DynGraph()
         g.add_path([0, 1, 2, 3, 4], t=5)
@@ -212,6 +276,73 @@ class DynGraphTestCase(unittest.TestCase):
         ng = g.degree(4, 0)
         self.assertEqual(ng, 0)
 
+        ng = g.degree([6, 2, 9, 2, 4])
+        self.assertEqual(list(ng), [6, 2, 4])
+
+    def test_snapshot_degree(self):
+        for removal in [True, False]:
+            g = dn.DynGraph(edge_removal=removal)
+            g.add_interaction(0, 1, 0, e=3)
+            g.add_interaction(1, 2, 2)
+            g.add_interaction(2, 2, 2, e=5)
+            g.add_interaction(0, 1, 6)
+            g.add_node(7)
+            nds = g.nodes()
+            for t in range(0, 8):
+                self.assertDictEqual(g.degree(t=t), g.degree(nds, t=t))
+                active = [n for n, d in g.degree(t=t).items() if d > 0]
+                self.assertListEqual(g.nodes(t=t), active)
+                self.assertEqual(g.number_of_nodes(t=t), len(active))
+
+    def test_snapshot_interactions(self):
+        g = dn.DynGraph()
+        g.add_interaction(0, 1, 0, e=4)
+        self.assertEqual(g.interactions(t=2), [(0, 1, {'t': [2]})])
+        g.add_interaction(1, 2, 2)
+        self.assertEqual(sorted((u, v) for u, v, _ in g.interactions(t=2)), [(0, 1), (1, 2)])
+        self.assertEqual(g.interactions(t=3), [(0, 1, {'t': [3]})])
+        self.assertEqual(g.interactions(t=5), [])
+
+    def test_bulk_interactions(self):
+        for e in [None, 4]:
+            g = dn.DynGraph()
+            g.add_interactions_from([(0, 1), (1, 2), (2, 3)], t=1, e=e)
+            h = dn.DynGraph()
+            for u, v in [(0, 1), (1, 2), (2, 3)]:
+                h.add_interaction(u, v, t=1, e=e)
+            self.assertDictEqual(g.snapshots, h.snapshots)
+            self.assertEqual(g.interactions(), h.interactions())
+            self.assertEqual(dict(g.time_to_edge), dict(h.time_to_edge))
+
+    def test_size(self):
+        g = dn.DynGraph()
+        g.add_path([0, 1, 2, 3], t=0)
+        g.add_interaction(3, 3, t=1, e=3)
+        g.add_interaction(0, 3, t=2)
+        self.assertEqual(g.size(), sum(g.degree().values()) // 2)
+        self.assertEqual(g.size(t=0), 3)
+        self.assertEqual(g.size(t=1), 0)
+        self.assertEqual(g.size(t=2), 1)
+        g.add_interaction(1, 2, t=2)
+        self.assertEqual(g.size(t=2), 2)
+        self.assertEqual(g.size(t=5), 0)
+
+    def test_interaction_data(self):
+        g = dn.DynGraph()
+        g.add_interaction(0, 1, t=0, e=3)
+        d = g.adj[0][1]
+        self.assertIs(d, g.adj[1][0])
+        self.assertEqual(d, {'t': [[0, 2]]})
+        self.assertEqual(dict(d), {'t': [[0, 2]]})
+        self.assertIn('t', d)
+        self.assertNotIn('weight', d)
+        d['weight'] = 2
+        self.assertEqual(sorted(d.items()), [('t', [[0, 2]]), ('weight', 2)])
+        del d['weight']
+        self.assertEqual(len(d), 1)
+        h = pickle.loads(pickle.dumps(g))
+        self.assertEqual(h.interactions(), g.interactions())
+
     def test_number_of_nodes(self):
         g = dn.DynGraph()
         g.add_path([0, 1, 2, 3, 4], t=5)
@@ -309,6 +440,13 @@ class DynGraphTestCase(unittest.TestCase):
         self.assertEqual(h.number_of_nodes(), 0)
         self.assertEqual(h.number_of_interactions(), 0)
 
+        # float bounds do not turn the integer spans they do not clip into floats
+        g.add_interaction(9, 10, 2, e=5)
+        h = g.time_slice(1.5, 5.0)
+        self.assertEqual(h._adj[9][10]['t'], g.time_slice(2, 5)._adj[9][10]['t'])
+        self.assertIs(type(h._adj[9][10]['t'][0][0]), int)
+        self.assertEqual(h.temporal_snapshots_ids(), g.time_slice(2, 5).temporal_snapshots_ids())
+
     def test_temporal_snapshots_ids(self):
         g = dn.DynGraph()
         g.add_path([0, 1, 2, 3, 4], t=5)
@@ -331,6 +469,19 @@ class DynGraphTestCase(unittest.TestCase):
         tsd = g.interactions_per_snapshots(t=0)
         self.assertEqual(tsd, 0)
 
+    def test_span_snapshots(self):
+        g = dn.DynGraph()
+        g.add_interaction(0, 1, 2, e=5)
+        g.add_interaction(1, 2, 3, e=7)
+        self.assertEqual(g.temporal_snapshots_ids(), [2, 3, 4, 5, 6])
+        self.assertDictEqual(g.interactions_per_snapshots(), {2: 0.5, 3: 1, 4: 1, 5: 0.5, 6: 0.5})
+
+        g.add_interaction(2, 3, 4)
+        g.add_interaction(3, 4, 9, e=11)
+        self.assertEqual(g.temporal_snapshots_ids(), [2, 3, 4, 5, 6, 9, 10])
+        self.assertEqual(g.interactions_per_snapshots(t=4), 2)
+        self.assertEqual(g.interactions_per_snapshots(t=8), 0)
+
     def test_inter_event_time(self):
         g = dn.DynGraph()
         g.add_path([0, 1, 2, 3, 4], t=2)
@@ -363,6 +514,21 @@ class DynGraphTestCase(unittest.TestCase):
         cres = [(1, 2, '+', 2), (1, 3, '+', 2), (1, 5, '+', 2), (1, 3, '-', 3),
                 (1, 5, '-', 3), (1, 2, '-', 6), (1, 2, '+', 7), (1, 2, '-', 15), (1, 2, '+', 18)]
         self.assertEqual(sorted(sres), sorted(cres))
+        self.assertEqual(list(g.stream_interactions()), sres)
+
+        sarr = g.stream_interactions_array()
+        self.assertEqual(list(zip(sarr.src, sarr.dst, sarr.op, sarr.t)), sres)
+        self.assertEqual(len(dn.stream_interactions(g, as_array=True)), len(sres))
+
+        h = dn.DynGraph()
+        h.add_interaction((0, 0), (0, 1), 0)
+        sarr = h.stream_interactions_array()
+        self.assertEqual(list(zip(sarr.src, sarr.dst)), [((0, 0), (0, 1))])
+
+        g.add_interaction(4, 5, 0)
+        sres = list(g.stream_interactions())
+        self.assertEqual(sres[0], (4, 5, '+', 0))
+        self.assertEqual(sres[1:], [e for e in sres[1:] if e[3] >= 2])
 
     def test_accumulative_growth(self):
         g = dn.DynGraph(edge_removal=False)
@@ -1,5 +1,6 @@
 import unittest
 import dynetx as dn
+import networkx as nx
 
 
 class FunctionTestCase(unittest.TestCase):
@@ -51,6 +52,8 @@ class FunctionTestCase(unittest.TestCase):
         self.assertEqual(len(list(dn.non_neighbors(g, 1, t=0))), 6)
         self.assertEqual(len(list(dn.non_neighbors(g, 1))), 3)
         self.assertEqual(len(list(dn.non_neighbors(g, 1, t=2))), 5)
+        with self.assertRaises(nx.NetworkXError):
+            dn.non_neighbors(g, 100)
         dn.non_interactions(g, 2)
         dn.non_interactions(g, 0)
         dn.non_interactions(g)
@@ -158,6 +161,8 @@ class FunctionTestCase(unittest.TestCase):
         self.assertEqual(len(list(dn.non_neighbors(g, 1, t=0))), 6)
         self.assertEqual(len(list(dn.non_neighbors(g, 1))), 3)
         self.assertEqual(len(list(dn.non_neighbors(g, 1, t=2))), 5)
+        with self.assertRaises(nx.NetworkXError):
+            dn.non_neighbors(g, 100)
         dn.non_interactions(g, 2)
         dn.non_interactions(g, 0)
         dn.non_interactions(g)
@@ -228,5 +233,87 @@ class FunctionTestCase(unittest.TestCase):
         h = g.to_undirected(reciprocal=True)
         self.assertEqual(h.number_of_interactions(), 3)
 
+    def test_frozen_neighbors(self):
+        for removal in [True, False]:
+            g = dn.DynGraph(edge_removal=removal)
+            h = dn.DynDiGraph(edge_removal=removal)
+            for x in [g, h]:
+                x.add_interaction(0, 1, 0, e=3)
+                x.add_interaction(1, 2, 2)
+                x.add_interaction(2, 0, 1, e=2)
+                x.add_interaction(0, 1, 5)
+                x.add_interaction(1, 1, 4)
+            ng = {(n, t): g.neighbors(n, t=t) for n in g.nodes() for t in range(7)}
+            sh = {(n, t): (h.successors(n, t=t), h.predecessors(n, t=t)) for n in h.nodes() for t in range(7)}
+
+            dn.freeze(g)
+            dn.freeze(h)
+            self.assertDictEqual(ng, {(n, t): g.neighbors(n, t=t) for n in g.nodes() for t in range(7)})
+            self.assertDictEqual(ng, {(n, t): list(g.neighbors_iter(n, t=t)) for n in g.nodes() for t in range(7)})
+            self.assertDictEqual(sh, {(n, t): (h.successors(n, t=t), h.predecessors(n, t=t))
+                                      for n in h.nodes() for t in range(7)})
+
+            g.add_interaction(2, 3, 6)
+            self.assertEqual(g.neighbors(3, t=6), [2])
+
+    def test_subgraph_neighbors(self):
+        for g in [dn.DynGraph(), dn.DynDiGraph()]:
+            g.add_path([0, 1, 2], t=0)
+            s = dn.subgraph(g, [0, 1, 2])
+            self.assertEqual(list(s.neighbors(0, t=0)), [1])
+            g.add_interaction(0, 2, 0)
+            # the view filters the adjacency of g: it sees the new interaction
+            self.assertEqual(sorted(s.neighbors(0, t=0)), [1, 2])
+            if g.is_directed():
+                self.assertEqual(sorted(s.successors(0, t=0)), [1, 2])
+                self.assertEqual(sorted(s.predecessors(2, t=0)), [0, 1])
+
+    def test_clear(self):
+        for g in [dn.DynGraph(), dn.DynDiGraph()]:
+            g.add_path([0, 1, 2], t=0)
+            g.add_interaction(2, 2, 1, e=3)
+            self.assertEqual(len(g.interactions(t=0)), 2)
+            g.clear_edges()
+            self.assertEqual(g.number_of_nodes(), 3)
+            self.assertEqual(g.size(), 0)
+            self.assertEqual(g.size(t=0), 0)
+            self.assertEqual(g.interactions(t=0), [])
+            self.assertEqual(dn.is_empty(g), True)
+            self.assertEqual(g.temporal_snapshots_ids(), [])
+            self.assertEqual(list(g.stream_interactions()), [])
+
+            g.add_path([0, 1, 2], t=0)
+            g.clear()
+            self.assertEqual(g.number_of_nodes(), 0)
+            self.assertEqual(g.size(), 0)
+            self.assertEqual(g.interactions(t=0), [])
+            self.assertEqual(dn.is_empty(g), True)
+
+            g.add_interaction(0, 1, 4)
+            self.assertEqual(g.size(), 1)
+            self.assertEqual(g.temporal_snapshots_ids(), [4])
+
+    def test_subgraph_update(self):
+        for g in [dn.DynGraph(), dn.DynDiGraph()]:
+            g.add_path([0, 1, 2], t=0)
+            s = dn.subgraph(g, [0, 1, 2])
+            self.assertEqual(s.degree(t=0), {0: 1, 1: 2, 2: 1})
+            self.assertEqual(s.size(t=0), 2)
+            self.assertEqual(len(s.interactions(t=0)), 2)
+            g.add_interaction(0, 2, 0)
+            self.assertEqual(s.degree(t=0), {0: 2, 1: 2, 2: 2})
+            self.assertEqual(s.size(t=0), 3)
+            self.assertEqual(len(s.interactions(t=0)), 3)
+
+    def test_subgraph_size(self):
+        for g, density in ((dn.DynGraph(), 2 / 3), (dn.DynDiGraph(), 1 / 3)):
+            g.add_path([0, 1, 2, 3], t=0)
+            s = dn.subgraph(g, [0, 1, 2])
+            self.assertEqual(s.size(), 2)
+            self.assertEqual(dn.number_of_interactions(s), 2)
+            self.assertAlmostEqual(dn.density(s), density)
+            self.assertEqual(dn.is_empty(s), False)
+            self.assertEqual(dn.is_empty(dn.subgraph(g, [0, 2])), True)
+
 if __name__ == '__main__':
     unittest.main()
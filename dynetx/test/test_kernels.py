@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+from dynetx.utils import kernels
+
+
+@unittest.skipIf(kernels.njit is None, "Numba is not installed")
+class KernelsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        rows, self.n = 5000, 50
+        self.src = rng.randint(0, self.n, rows).astype(np.int64)
+        self.dst = rng.randint(0, self.n, rows).astype(np.int64)
+        self.dst[:100] = self.src[:100]  # self loops
+        self.t_start = rng.randint(0, 20, rows).astype(np.int64)
+        self.t_end = self.t_start + rng.randint(0, 5, rows)
+
+    def test_slice_spans(self):
+        rows = np.flatnonzero(self.t_start <= 12)
+        for t_from, t_to in [(0, 12), (5, 12), (12, 12), (5.5, 12.0)]:
+            expected = kernels._slice_spans_numpy(rows, self.t_start, self.t_end, t_from, t_to)
+            dtype = np.result_type(self.t_start, self.t_end, t_from, t_to)
+            result = kernels._slice_spans_jit(rows, self.t_start.astype(dtype), self.t_end.astype(dtype),
+                                              t_from, t_to)
+            for a, b in zip(result, expected):
+                self.assertEqual(a.tolist(), b.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,6 +31,23 @@ except ImportError:
             total = func(total, element)
             yield total
 
+# itertools.pairwise is only available on Python 3.10 or later.
+#
+# Once support for Python versions less than 3.10 is dropped, this code should
+# be removed.
+try:
+    from itertools import pairwise
+except ImportError:
+    from itertools import tee
+
+    # The code for this function is from the Python 3.10 documentation,
+    # distributed under the PSF license:
+    # <https://docs.python.org/3.10/library/itertools.html#itertools.pairwise>
+    def pairwise(iterable):
+        a, b = tee(iterable)
+        next(b, None)
+        return zip(a, b)
+
 __author__ = '\n'.join(['Aric Hagberg (hagberg@lanl.gov)',
                         'Dan Schult(dschult@colgate.edu)',
                         'Ben Edwards(bedwards@cs.unm.edu)'])